@@ -1,18 +1,25 @@
 import os
-import re
+import hashlib
 import smtplib
 import zipfile
-import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from itertools import islice
 from io import BytesIO
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
 import streamlit as st
-from pathspec import PathSpec
+from pathspec import GitIgnoreSpec
 import google.generativeai as genai
 from dotenv import load_dotenv
+from xml.sax.saxutils import escape
 from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from PyPDF2 import PdfReader, PdfWriter
 
 # Load environment variables (e.g., API keys, email credentials)
 load_dotenv()
@@ -23,10 +30,8 @@ os.environ["STREAMLIT_SERVER_MAX_UPLOAD_SIZE"] = "500"
 # Import custom scanner modules for vulnerability and configuration analysis
 from scanner.parsers import parse_requirements_txt
 from scanner.osv_client import OSVClient
-from scanner.secret_rules import scan_text as scan_secrets, SKIP_DIRS
-from scanner.config_rules import scan_text as scan_configs
 from scanner.scorer import score_findings
-from scanner.utils import extract_zip_to_memory, is_text_path
+from scanner.utils import MAX_BYTES, extract_zip_to_memory, read_gitignore, scan_files
 
 # Streamlit UI setup
 st.set_page_config(page_title="Cyber Health Audit Agent", page_icon="🛡️", layout="wide")
@@ -48,10 +53,27 @@ st.markdown("### Enter mail id to send or receive report")
 user_email = st.text_input("Enter your email", placeholder="youremail@example.com")
 
 
+# PyPI "latest version" answers are cached on disk for a day across runs;
+# Cache-Control/ETag headers sent by PyPI are honored. The session itself is
+# kept across Streamlit reruns so its pooled TLS connections to pypi.org are
+# reused, with enough slots for every lookup thread.
+PYPI_WORKERS = 32
+
+
+@st.cache_resource
+def _pypi_session() -> requests_cache.CachedSession:
+    session = requests_cache.CachedSession("pypi_cache.sqlite", expire_after=86400, cache_control=True)
+    session.mount("https://", HTTPAdapter(pool_connections=PYPI_WORKERS, pool_maxsize=PYPI_WORKERS))
+    return session
+
+
+pypi_session = _pypi_session()
+
+
 # Fetches the latest version of a Python package from PyPI.
 def get_latest_version(pkg_name: str) -> str:
     try:
-        resp = requests.get(f"https://pypi.org/pypi/{pkg_name}/json", timeout=10)
+        resp = pypi_session.get(f"https://pypi.org/pypi/{pkg_name}/json", timeout=10)
         if resp.status_code == 200:
             return resp.json().get("info", {}).get("version", "latest")
     except Exception:
@@ -62,33 +84,172 @@ def get_latest_version(pkg_name: str) -> str:
 
 # Function: combine_files_to_zip
 # Combines multiple uploaded files into an in-memory ZIP file for scanning.
+# Entries get a fixed timestamp (ZipInfo's default) so the same files always
+# produce the same bytes and hit the scan cache below.
 def combine_files_to_zip(files):
     zip_buffer = BytesIO()
     with zipfile.ZipFile(zip_buffer, "w") as zf:
         for file in files:
-            zf.writestr(file.name, file.read())
+            zf.writestr(zipfile.ZipInfo(file.name), file.read())
     zip_buffer.seek(0)
     return zip_buffer
 
 
 
+# Cached on the uploaded content, so Streamlit reruns (button clicks, text
+# input) skip re-parsing and re-scanning when the inputs have not changed.
+# The ZIP functions are keyed on a digest computed once per run (zip_key);
+# the leading underscore keeps Streamlit from re-hashing the raw bytes.
+@st.cache_data(show_spinner=False)
+def parse_reqs(text: str) -> list:
+    return parse_requirements_txt(text)
+
+
+SCAN_BATCH = 16
+
+
+@st.cache_data(show_spinner=False)
+def scan_zip(zip_key: str, _zip_bytes: bytes) -> tuple[list, list, int, int]:
+    # Use the project's .gitignore to skip ignored files
+    spec = GitIgnoreSpec.from_lines(read_gitignore(_zip_bytes))
+
+    # Scan all project files for secrets and insecure configs in batches of
+    # SCAN_BATCH files across all CPU cores (processes, since regex matching
+    # holds the GIL). Binary and vendored entries are skipped without being
+    # decompressed, and entries are pulled from the archive lazily: at most a
+    # couple of batches per worker are in flight, so peak memory tracks that
+    # window rather than the size of the whole archive. Text files over
+    # MAX_BYTES are not scanned but collected in oversized to be reported.
+    oversized = []
+    entries = (
+        (path, data)
+        for path, data in extract_zip_to_memory(
+            _zip_bytes, text_only=True, max_bytes=MAX_BYTES, skipped=oversized
+        )
+        if not spec.match_file(path)
+    )
+    secret_findings, config_findings, count_scanned = [], [], 0
+    workers = os.cpu_count() or 1
+    pending = deque()
+
+    def collect(future):
+        secrets, configs = future.result()
+        secret_findings.extend(secrets)
+        config_findings.extend(configs)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while batch := list(islice(entries, SCAN_BATCH)):
+            count_scanned += len(batch)
+            pending.append(executor.submit(scan_files, batch))
+            if len(pending) > 2 * workers:
+                collect(pending.popleft())
+        while pending:
+            collect(pending.popleft())
+    count_skipped = sum(1 for path in oversized if not spec.match_file(path))
+    return secret_findings, config_findings, count_scanned, count_skipped
+
+
+# Gemini only sees the first few files, so stop reading once we have them
+GEMINI_MAX_FILES = 10
+GEMINI_MAX_CHARS = 200000
+
+
+@st.cache_data(show_spinner=False)
+def audit_file_texts(zip_key: str, _zip_bytes: bytes) -> list:
+    file_texts = []
+    # UTF-8 uses at most 4 bytes per character, so valid text larger than this
+    # cannot fit under GEMINI_MAX_CHARS; such members are skipped unread
+    members = extract_zip_to_memory(_zip_bytes, text_only=True, max_bytes=4 * GEMINI_MAX_CHARS)
+    for path, data in members:
+        text = data.decode("utf-8", errors="ignore")
+        if len(text) < GEMINI_MAX_CHARS:
+            file_texts.append(f"### File: {path}\n{text}")
+            if len(file_texts) == GEMINI_MAX_FILES:
+                break
+    return file_texts
+
+
+
+# PDF report helpers. Flowables are laid out by platypus, so long reports break
+# across pages instead of running off the bottom of the first one.
+PDF_STYLES = getSampleStyleSheet()
+
+
+def pdf_section(title, lines, empty="None detected"):
+    return (
+        [Paragraph(title, PDF_STYLES["Heading2"])]
+        + ([Paragraph(escape(line), PDF_STYLES["Normal"]) for line in lines]
+           or [Paragraph(empty, PDF_STYLES["Normal"])])
+        + [Spacer(1, 6)]
+    )
+
+
+def build_pdf(title: str, sections: list) -> bytes:
+    pdf_buffer = BytesIO()
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=letter, title=title)
+    doc.build([flowable for section in sections for flowable in section])
+    return pdf_buffer.getvalue()
+
+
+def build_findings_pdf(zip_name, score, vuln_flat, secret_findings, config_findings) -> bytes:
+    header = [
+        Paragraph(escape(f"Cyber Health Report - {zip_name}"), PDF_STYLES["Title"]),
+        Paragraph(f"Score: {score}/100", PDF_STYLES["Normal"]),
+        Spacer(1, 12),
+    ]
+    return build_pdf(f"{zip_name}_Report", [
+        header,
+        pdf_section("Vulnerability Findings:", [
+            f"⚠️ {v['package']} {v.get('version', 'unknown')} → "
+            f"upgrade to {v.get('recommended_version', 'latest')} or later."
+            for v in vuln_flat
+        ]),
+        pdf_section("Secret Findings:", [
+            f"🔑 {s['path']} — move secrets to .env" for s in secret_findings
+        ]),
+        pdf_section("Configuration Findings:", [
+            f"🛠️ {c['desc']} ({c['path']}) — {c['fix']}" for c in config_findings
+        ]),
+    ])
+
+
+def merge_pdfs(title: str, *parts: bytes) -> bytes:
+    writer = PdfWriter()
+    for part in parts:
+        for page in PdfReader(BytesIO(part)).pages:
+            writer.add_page(page)
+    writer.add_metadata({"/Title": title})
+    out = BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+# One small pool for background PDF builds, kept across reruns by Streamlit
+@st.cache_resource
+def _pdf_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=2)
+
+
+EXECUTOR = _pdf_executor()
+
+
+
 # Step 1: Parse requirements.txt
 
+PIN_CHARS = frozenset("=<>!~")
 items = []
 unpinned_detected = False
 if req_file:
     text = req_file.read().decode("utf-8", errors="ignore")
 
-    # Detect if any dependencies are unpinned (no version specified)
+    # Detect if any dependencies are unpinned (no version specifier character)
     unpinned_detected = any(
-        not re.search(r"[=<>!~]{1,2}", line)
-        and line.strip()
-        and not line.strip().startswith("#")
-        for line in text.splitlines()
+        s and not s.startswith("#") and PIN_CHARS.isdisjoint(s)
+        for s in (line.strip() for line in text.splitlines())
     )
 
     # Parse dependencies into structured list
-    items = parse_requirements_txt(text)
+    items = parse_reqs(text)
     st.caption(f"Parsed {len(items)} dependencies from requirements.txt")
 
 
@@ -96,8 +257,8 @@ if req_file:
 # Step 2: Extract and scan uploaded project files
 
 secret_findings, config_findings = [], []
-gitignore_patterns = []
 zip_bytes = None
+zip_key = None
 zip_name = "project"
 
 if uploaded_files:
@@ -110,33 +271,18 @@ if uploaded_files:
         combined_zip = combine_files_to_zip(uploaded_files)
         zip_bytes = combined_zip.read()
 
-    # Extract all files into memory
+    # BLAKE2b is in the stdlib and hashes faster than MD5/SHA-256 on 64-bit CPUs
+    zip_key = hashlib.blake2b(zip_bytes, digest_size=16).hexdigest()
     try:
-        files = extract_zip_to_memory(zip_bytes)
+        secret_findings, config_findings, count_scanned, count_skipped = scan_zip(zip_key, zip_bytes)
     except Exception as e:
         st.error(f"Could not read uploaded files: {e}")
         st.stop()
-
-    # Check for .gitignore to skip ignored files
-    for path, data in files:
-        if path.endswith(".gitignore"):
-            gitignore_patterns = data.decode("utf-8", errors="ignore").splitlines()
-            break
-
-    spec = PathSpec.from_lines("gitwildmatch", gitignore_patterns)
-    count_scanned = 0
-
-    # Scan all project files for secrets and insecure configs
-    for path, data in extract_zip_to_memory(zip_bytes):
-        if spec.match_file(path):
-            continue
-        if not is_text_path(path) or any(p in SKIP_DIRS for p in path.split("/")):
-            continue
-        text = data.decode("utf-8", errors="ignore")
-        secret_findings.extend(scan_secrets(path, text))
-        config_findings.extend(scan_configs(path, text))
-        count_scanned += 1
-    st.caption(f"Scanned {count_scanned} files (respecting .gitignore).")
+    caption = f"Scanned {count_scanned} files (respecting .gitignore)."
+    if count_skipped:
+        # Not scanned for secrets/configs, so a leak could hide in them
+        caption += f" Skipped {count_skipped} files over {MAX_BYTES // (1024 * 1024)} MiB."
+    st.caption(caption)
 
 
 
@@ -167,14 +313,23 @@ if st.button("Generate Cyber Health Score"):
                 except Exception as e:
                     st.warning(f"OSV.dev lookup failed ({e})")
 
-            # Add recommended version info for each package
+            # Add recommended version info for each package; the PyPI lookups
+            # are independent network calls, so fan them out over threads
+            packages = list(dict.fromkeys(v["package"] for v in vuln_flat))
+            with ThreadPoolExecutor(max_workers=PYPI_WORKERS) as executor:
+                latest = dict(zip(packages, executor.map(get_latest_version, packages)))
             for v in vuln_flat:
-                v["recommended_version"] = get_latest_version(v["package"])
+                v["recommended_version"] = latest[v["package"]]
 
             # Combine all findings into a score
             result = score_findings(vuln_flat, secret_findings, config_findings)
             score = result.get("score", 0)
 
+        # Render the findings pages off the UI thread; Gemini runs meanwhile
+        pdf_future = EXECUTOR.submit(
+            build_findings_pdf, zip_name, score, vuln_flat, secret_findings, config_findings
+        )
+
         # Display results in Streamlit
         st.subheader("Findings (Quick Summary)")
         if not (vuln_flat or secret_findings or config_findings):
@@ -211,15 +366,7 @@ if st.button("Generate Cyber Health Score"):
                 genai.configure(api_key=api_key)
                 model = genai.GenerativeModel("gemini-2.0-flash")
 
-                file_texts = []
-                for path, data in extract_zip_to_memory(zip_bytes):
-                    if not is_text_path(path) or any(p in SKIP_DIRS for p in path.split("/")):
-                        continue
-                    text = data.decode("utf-8", errors="ignore")
-                    if len(text) < 200000:
-                        file_texts.append(f"### File: {path}\n{text}")
-
-                joined_text = "\n\n".join(file_texts[:10])
+                joined_text = "\n\n".join(audit_file_texts(zip_key, zip_bytes))
                 prompt = f"""
 You are a cybersecurity auditor.
 Analyze these files for:
@@ -244,51 +391,14 @@ Files:
 
         # Step 6: Generate PDF Report
 
-        pdf_buffer = BytesIO()
-        pdf = canvas.Canvas(pdf_buffer, pagesize=letter)
-        pdf.setTitle(f"{zip_name}_Report")
-
-        text_object = pdf.beginText(40, 750)
-        text_object.setFont("Helvetica", 11)
-        text_object.textLine(f"Cyber Health Report - {zip_name}")
-        text_object.textLine(f"Score: {score}/100")
-        text_object.textLine("-" * 90)
-        text_object.textLine("")
-
-        text_object.textLine("## Vulnerability Findings:")
-        if not vuln_flat:
-            text_object.textLine("None detected")
-        else:
-            for v in vuln_flat:
-                current_ver = v.get("version", "unknown")
-                recommended = v.get("recommended_version", "latest")
-                text_object.textLine(f"⚠️ {v['package']} {current_ver} → upgrade to {recommended} or later.")
-
-        text_object.textLine("")
-        text_object.textLine("## Secret Findings:")
-        if not secret_findings:
-            text_object.textLine("None detected")
-        else:
-            for s in secret_findings:
-                text_object.textLine(f"🔑 {s['path']} — move secrets to .env")
-
-        text_object.textLine("")
-        text_object.textLine("## Configuration Findings:")
-        if not config_findings:
-            text_object.textLine("None detected")
-        else:
-            for c in config_findings:
-                text_object.textLine(f"🛠️ {c['desc']} ({c['path']}) — {c['fix']}")
-
-        text_object.textLine("")
-        text_object.textLine("Gemini Deep Audit Summary:")
-        text_object.textLines(gemini_output[:1500] if gemini_output else "No AI audit output available.")
-        pdf.drawText(text_object)
-        pdf.showPage()
-        pdf.save()
-
-        pdf_buffer.seek(0)
-        pdf_bytes = pdf_buffer.read()
+        # The findings pages were rendered in the background while Gemini ran;
+        # append the Gemini summary as its own page(s)
+        summary_pdf = build_pdf(f"{zip_name}_Report", [pdf_section(
+            "Gemini Deep Audit Summary:",
+            [line for line in gemini_output.splitlines() if line.strip()],
+            empty="No AI audit output available.",
+        )])
+        pdf_bytes = merge_pdfs(f"{zip_name}_Report", pdf_future.result(), summary_pdf)
 
         st.session_state["pdf_report"] = pdf_bytes
         st.session_state["pdf_name"] = f"{zip_name}_Report.pdf"
@@ -5,7 +5,8 @@ RULES = [
     {
         "id": "DEBUG_MODE",
         "desc": "Debug mode enabled in production (e.g., Flask/Django).",
-        "regex": re.compile(r"(?i)debug\s*=\s*(True|1)"),
+        "regex": re.compile(rb"debug\s*=\s*(True|1)", re.IGNORECASE),
+        "literals": (b"debug",),
         "severity": "high",
         "fix": "Set DEBUG=False in production and guard with environment variables.",
         "refs": ["OWASP A05: Security Misconfiguration"]
@@ -13,7 +14,10 @@ RULES = [
     {
         "id": "OPEN_HOSTS",
         "desc": "Overly permissive ALLOWED_HOSTS / CORS settings (\"*\").",
-        "regex": re.compile(r"(?i)(allowed_hosts|cors_allowed_origins)[^\n]*\*"),
+        # Lookahead, not [^\n]*\*, so the match ends at the keyword and the
+        # single combined pass still sees other findings later on the line
+        "regex": re.compile(rb"(allowed_hosts|cors_allowed_origins)(?=[^\n]*\*)", re.IGNORECASE),
+        "literals": (b"allowed_hosts", b"cors_allowed_origins"),
         "severity": "medium",
         "fix": "Specify exact hosts/origins; never use wildcard in production.",
         "refs": ["OWASP A01/A05", "CWE-16 Configuration"]
@@ -22,24 +26,45 @@ RULES = [
         "id": "HARDCODED_SECRET",
         "desc": "Hardcoded secret, API key, or password found in code.",
         "regex": re.compile(
-            r"(?i)(api[_\-]?key|secret[_\-]?key|token|password)\s*[:=]\s*['\"]?[A-Za-z0-9_\-\/=]{8,}['\"]?"
+            rb"(api[_\-]?key|secret[_\-]?key|token|password)\s*[:=]\s*['\"]?[A-Za-z0-9_\-\/=]{8,}['\"]?",
+            re.IGNORECASE,
         ),
+        "literals": (b"api", b"secret", b"token", b"password"),
         "severity": "critical",
         "fix": "Move hardcoded credentials to a .env file and load securely with environment variables.",
         "refs": ["OWASP A02: Cryptographic Failures", "CWE-798: Hardcoded Credentials"]
     },
 ]
 
-def scan_text(path: str, text: str) -> List[Dict]:
+# All rules folded into one alternation (one named group per rule id) so each
+# file is scanned in a single pass; m.lastgroup tells us which rule matched.
+# finditer never yields overlapping matches, so rule patterns must consume as
+# little as possible (see OPEN_HOSTS) or they hide findings after them.
+RULES_BY_ID = {rule["id"]: rule for rule in RULES}
+COMBINED = re.compile(
+    b"|".join(b"(?P<%s>%s)" % (rule["id"].encode(), rule["regex"].pattern) for rule in RULES),
+    re.IGNORECASE,
+)
+
+# Lower-cased byte strings at least one of which must appear for any rule to
+# match; files without them skip the regex engine entirely.
+LITERALS = tuple(dict.fromkeys(lit for rule in RULES for lit in rule["literals"]))
+
+def scan_text(path: str, data: bytes) -> List[Dict]:
+    # Rules are ASCII byte patterns, so raw file bytes are scanned as-is
+    # without decoding to str first.
     findings = []
-    for rule in RULES:
-        for m in rule["regex"].finditer(text):
-            findings.append({
-                "id": rule["id"],
-                "path": path,
-                "desc": rule["desc"],
-                "severity": rule["severity"],
-                "fix": rule["fix"],
-                "ref": ", ".join(rule["refs"])
-            })
+    lowered = data.lower()
+    if not any(lit in lowered for lit in LITERALS):
+        return findings
+    for m in COMBINED.finditer(data):
+        rule = RULES_BY_ID[m.lastgroup]
+        findings.append({
+            "id": rule["id"],
+            "path": path,
+            "desc": rule["desc"],
+            "severity": rule["severity"],
+            "fix": rule["fix"],
+            "ref": ", ".join(rule["refs"])
+        })
     return findings
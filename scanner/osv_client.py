@@ -2,15 +2,38 @@
 
 from __future__ import annotations
 import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 
 OSV_QUERY_URL = "https://api.osv.dev/v1/query"
 OSV_QUERY_BATCH_URL = "https://api.osv.dev/v1/querybatch"
+OSV_VULN_URL = "https://api.osv.dev/v1/vulns/{id}"
+# OSV rejects querybatch requests with more than 1000 queries
+OSV_BATCH_LIMIT = 1000
+# Concurrent GET /vulns/{id} requests when hydrating batch results
+OSV_WORKERS = 32
+
+# Full advisories keyed by (id, modified). An advisory only changes when its
+# "modified" timestamp does, so entries never need invalidating.
+_VULN_CACHE: Dict[tuple, Dict[str, Any]] = {}
 
 
 class OSVClient:
     def __init__(self, session: requests.Session | None = None, timeout: int = 15):
-        self.s = session or requests.Session()
+        if session is None:
+            # OSV answers for a (package, version) pair rarely change, so repeat
+            # audits are served from a local SQLite cache instead of the network.
+            session = requests_cache.CachedSession(
+                "osv_cache.sqlite",
+                expire_after=3600,
+                allowable_methods=("GET", "POST"),
+                cache_control=True,
+            )
+            # Room for every hydration thread to keep its own pooled connection
+            session.mount("https://", HTTPAdapter(pool_connections=OSV_WORKERS, pool_maxsize=OSV_WORKERS))
+        self.s = session
         self.timeout = timeout
 
     def query_pkg(self, name: str, version: str, ecosystem: str = "PyPI") -> Dict[str, Any]:
@@ -19,27 +42,71 @@ class OSVClient:
         r.raise_for_status()
         return r.json()
 
+    def get_vuln(self, vuln_id: str) -> Dict[str, Any]:
+        r = self.s.get(OSV_VULN_URL.format(id=vuln_id), timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def _try_get_vuln(self, vuln_id: str) -> Dict[str, Any] | None:
+        # One advisory that is withdrawn (404), slow or erroring must not sink
+        # the whole batch
+        try:
+            return self.get_vuln(vuln_id)
+        except (requests.RequestException, ValueError):
+            return None
+
+    def _post_batch(self, queries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        r = self.s.post(OSV_QUERY_BATCH_URL, json={"queries": queries}, timeout=self.timeout)
+        r.raise_for_status()
+        data = r.json()
+        return data.get("results", []) if data else []
+
     def query_batch(self, items: List[Dict[str, str]], ecosystem: str = "PyPI") -> List[Dict[str, Any]]:
         queries = [
             {"package": {"name": it["name"], "ecosystem": ecosystem}, "version": it["version"]}
             for it in items
         ]
-        r = self.s.post(OSV_QUERY_BATCH_URL, json={"queries": queries}, timeout=self.timeout)
-        r.raise_for_status()
-        data = r.json()
+        # Split into OSV-sized chunks and post them concurrently; executor.map
+        # keeps chunk order, so item i's answer is answers[i // limit][i % limit].
+        chunks = [queries[i : i + OSV_BATCH_LIMIT] for i in range(0, len(queries), OSV_BATCH_LIMIT)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            answers = list(executor.map(self._post_batch, chunks))
+
         results = []
         for i, q in enumerate(items):
-            vulns = data.get("results", [{}])[i].get("vulns", []) if data else []
+            chunk = answers[i // OSV_BATCH_LIMIT]
+            j = i % OSV_BATCH_LIMIT
+            vulns = chunk[j].get("vulns", []) if j < len(chunk) else []
             results.append({"name": q["name"], "version": q["version"], "vulns": vulns})
+        self._hydrate(results)
         return results
 
+    def _hydrate(self, results: List[Dict[str, Any]]) -> None:
+        """
+        querybatch only returns {"id", "modified"} per vulnerability; replace
+        those stubs with the full advisories (affected ranges, severity, ...)
+        fetched concurrently by id.
+        """
+        keys = dict.fromkeys(
+            (v["id"], v.get("modified")) for r in results for v in r["vulns"] if v.get("id")
+        )
+        missing = [key for key in keys if key not in _VULN_CACHE]
+        with ThreadPoolExecutor(max_workers=OSV_WORKERS) as executor:
+            for key, vuln in zip(missing, executor.map(self._try_get_vuln, [vid for vid, _ in missing])):
+                # Failed fetches stay uncached (retried next audit); the stub is
+                # kept below so the advisory still counts towards the score
+                if vuln is not None:
+                    _VULN_CACHE[key] = vuln
+        for r in results:
+            r["vulns"] = [_VULN_CACHE.get((v.get("id"), v.get("modified")), v) for v in r["vulns"]]
+
     @staticmethod
     def flatten_vulns(batch_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Flattens OSV batch results into simplified vulnerability entries
         while deduplicating and adding 'fixed' version info if available.
         """
-        flat: List[Dict[str, Any]] = []
+        merged: Dict[tuple, Dict[str, Any]] = {}
         seen_ids = set()
 
         for r in batch_results:
@@ -52,57 +119,33 @@ class OSVClient:
                     continue
                 seen_ids.add(vid)
 
-                
-                fixed_versions = []
-                for aff in v.get("affected", []):
-                    for rng in aff.get("ranges", []):
-                        for event in rng.get("events", []):
-                            if "fixed" in event:
-                                fixed_versions.append(event["fixed"])
-
-                fixed_hint = ""
-                if fixed_versions:
-                    fixed_hint = f"Upgrade to ≥ {fixed_versions[0]}"
-
-                flat.append(
-                    {
-                        "package": pkg,
-                        "version": ver,
-                        "id": vid,
-                        "aliases": v.get("aliases", []),
-                        "summary": v.get("summary", ""),
-                        "severity": v.get("severity", []),
-                        "fixed": fixed_versions,
-                        "fixed_hint": fixed_hint,
-                    }
+                # Merge multiple advisories for the same package into one entry with IDs combined
+                key = (pkg, ver)
+                entry = merged.get(key)
+                if entry is not None:
+                    entry["ids"].append(vid)
+                    continue
+
+                # Only the first advisory per package supplies the 'fixed' hint
+                fixed = next(
+                    (
+                        event["fixed"]
+                        for aff in v.get("affected", [])
+                        for rng in aff.get("ranges", [])
+                        for event in rng.get("events", [])
+                        if "fixed" in event
+                    ),
+                    None,
                 )
+                fixed_hint = f"Upgrade to ≥ {fixed}" if fixed is not None else ""
 
-        # Merge multiple advisories for the same package into one entry with IDs combined
-        merged: Dict[str, Dict] = {}
-        for v in flat:
-            key = (v["package"], v["version"])
-            if key not in merged:
                 merged[key] = {
-                    "package": v["package"],
-                    "version": v["version"],
-                    "ids": [v["id"]],
-                    "aliases": v["aliases"],
-                    "summary": v["summary"],
-                    "severity": v["severity"],
-                    "fixed_hint": v["fixed_hint"],
+                    "package": pkg,
+                    "version": ver,
+                    "ids": [vid],
+                    "summary": v.get("summary", ""),
+                    "severity": v.get("severity", []),
+                    "fixed_hint": fixed_hint,
                 }
-            else:
-                merged[key]["ids"].append(v["id"])
-
-        # Convert merged dict to list
-        return [
-            {
-                "package": v["package"],
-                "version": v["version"],
-                "ids": v["ids"],
-                "summary": v["summary"],
-                "severity": v["severity"],
-                "fixed_hint": v.get("fixed_hint", ""),
-            }
-            for v in merged.values()
-        ]
+
+        return list(merged.values())
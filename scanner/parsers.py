@@ -6,10 +6,19 @@ from typing import List, Dict
 
 # Regex pattern to match lines like:
 # flask==2.1.0  OR  requests>=2.20
+# Applied to the whole text in MULTILINE mode; [^\S\n] is whitespace that
+# never crosses a line break. Comment lines cannot match since "#" is not
+# a valid name character, and the specifier is required so unpinned lines
+# are skipped by the regex itself.
 REQ_LINE = re.compile(
-    r"^(?P<name>[A-Za-z0-9_.-]+)\s*([=~!<>]{1,2}\s*(?P<ver>[A-Za-z0-9_.+-]+))?"
+    r"^[^\S\n]*(?P<name>[A-Za-z0-9_.-]+)[^\S\n]*[=~!<>]{1,2}[^\S\n]*(?P<ver>[A-Za-z0-9_.+-]+)",
+    re.MULTILINE,
 )
 
+# Plain release numbers (no leading zeros) are already what Version() would
+# normalize them to, so they skip the PEP 440 round-trip
+_CANON_VER = re.compile(r"\A(?:0|[1-9]\d*)(?:\.(?:0|[1-9]\d*)){0,3}\Z")
+
 # -------------------------------------------------------------------
 # Very small parser for requirements.txt style pinned dependencies
 # -------------------------------------------------------------------
@@ -21,26 +30,17 @@ def parse_requirements_txt(text: str) -> List[Dict[str, str]]:
     """
     items: List[Dict[str, str]] = []
 
-    for line in text.splitlines():
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-
-        m = REQ_LINE.match(line)
-        if not m:
-            continue
-
-        name = m.group("name")
-        ver = m.group("ver") or "*"
+    # One scan over the whole text; only pinned lines produce a match
+    for m in REQ_LINE.finditer(text):
+        name, ver = m.group(1, 2)
 
-        # Only send pinned versions to OSV; skip wildcards
-        if ver != "*":
-            # Normalize version string if possible
+        # Normalize version string if possible
+        if not _CANON_VER.match(ver):
             try:
                 ver = str(Version(ver))
             except InvalidVersion:
                 pass
 
-            items.append({"name": name, "version": ver})
+        items.append({"name": name, "version": ver})
 
     return items
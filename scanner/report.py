@@ -1,6 +1,8 @@
 # scanner/report.py
 from __future__ import annotations
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from itertools import chain
 import re
 
 HEADER = """\
@@ -10,45 +12,73 @@ This quick scan highlights risky items that map to OWASP Top 10, NIST SSDF, and
 Fix the items in the Safe Fix Checklist to improve your score and reduce risk of leaks or downtime.
 """
 
+# Version number inside a fixed hint such as "Upgrade to ≥ 2.0.7"
+_VER_RE = re.compile(r"([0-9]+\.[0-9]+(?:\.[0-9]+)?)")
+
 
 # --- Helpers for friendlier language ---------------------------------------
-def _vuln_remedy_text(vuln: Dict[str, Any]) -> str:
-    """
-    Return a short remedy like:
-      "upgrade to 2.3.2 or later."
-    or a generic 'check OSV' fallback.
-    """
+@lru_cache(maxsize=512)
+def _remedy_from(fixed_hint: str, first_fixed: Optional[str]) -> str:
+    """Build the remedy text; cached since the same vuln repeats across packages."""
     # Prefer explicit fixed hint (string like "Upgrade to ≥ 2.0.7")
-    fixed_hint = vuln.get("fixed_hint") or ""
     if fixed_hint:
         # try to extract a version number
-        m = re.search(r"([0-9]+\.[0-9]+(?:\.[0-9]+)?)", fixed_hint)
+        m = _VER_RE.search(fixed_hint)
         if m:
             ver = m.group(1)
             return f"upgrade to {ver} or later."
         return fixed_hint
 
     # If the vuln has a 'fixed' list, choose first
-    fixed_list = vuln.get("fixed") or vuln.get("fixed_versions") or []
-    if fixed_list:
-        ver = fixed_list[0]
-        return f"upgrade to {ver} or later."
+    if first_fixed is not None:
+        return f"upgrade to {first_fixed} or later."
 
     # Fallback generic
     return "upgrade to a non-vulnerable version (see OSV)."
 
 
+def _vuln_remedy_text(vuln: Dict[str, Any]) -> str:
+    """
+    Return a short remedy like:
+      "upgrade to 2.3.2 or later."
+    or a generic 'check OSV' fallback.
+    """
+    fixed_hint = vuln.get("fixed_hint") or ""
+    fixed_list = vuln.get("fixed") or vuln.get("fixed_versions") or []
+    return _remedy_from(fixed_hint, fixed_list[0] if fixed_list else None)
+
+
+# Exact-type lookup for the types scan_text emits (see secret_rules.RULES);
+# anything else goes through the keyword checks in _secret_short_line.
+_PASSWORD_LINE = "🚨 Weak password detected in {path} — change immediately."
+_AWS_LINE = "🔑 AWS credentials found in {path} — rotate and move to a secret manager."
+_TOKEN_LINE = "🔑 API key/token found in {path} — move it to a secure file or secret manager."
+_PRIVATE_KEY_LINE = "🔐 Private key detected in {path} — remove from repo and rotate immediately."
+_SECRET_FORMATTERS = {
+    "Password Hardcode": _PASSWORD_LINE,
+    "AWS Access Key": _AWS_LINE,
+    "AWS Secret Key": _AWS_LINE,
+    "Google API Key": _TOKEN_LINE,
+    "Generic Bearer Token": _TOKEN_LINE,
+    "Slack Token": _TOKEN_LINE,
+    "Private Key": _PRIVATE_KEY_LINE,
+}
+
+
 def _secret_short_line(s: Dict[str, Any]) -> str:
-    typ = s.get("type", "").lower()
     path = s.get("path", "<file>")
+    template = _SECRET_FORMATTERS.get(s.get("type"))
+    if template is not None:
+        return template.format(path=path)
+    typ = s.get("type", "").lower()
     if "password" in typ or "hardcode" in typ:
-        return f"🚨 Weak password detected in {path} — change immediately."
+        return _PASSWORD_LINE.format(path=path)
     if "aws access key" in typ or "aws secret" in typ:
-        return f"🔑 AWS credentials found in {path} — rotate and move to a secret manager."
+        return _AWS_LINE.format(path=path)
     if "google api key" in typ or "api key" in typ or "bearer token" in typ or "slack" in typ:
-        return f"🔑 API key/token found in {path} — move it to a secure file or secret manager."
+        return _TOKEN_LINE.format(path=path)
     if "private key" in typ:
-        return f"🔐 Private key detected in {path} — remove from repo and rotate immediately."
+        return _PRIVATE_KEY_LINE.format(path=path)
     # generic fallback
     return f"🔑 Secret pattern ({s.get('type')}) found in {path} — remove and rotate."
 
@@ -64,8 +94,15 @@ def _config_short_line(c: Dict[str, Any]) -> str:
         return f"🛠️ Wildcard hosts/CORS in {path} — specify exact hosts/origins."
     return f"🛠️ {desc} ({path}) — {c.get('fix','Review and fix this configuration.')}"
 
+def _has_findings(findings: Dict) -> bool:
+    # Sections are built from these three lists only
+    return bool(findings.get("vulns") or findings.get("secrets") or findings.get("configs"))
+
+
 # --- One-line findings generator ------------------------------------------
 def one_liners(findings: Dict) -> List[str]:
+    if not _has_findings(findings):
+        return []
     lines: List[str] = []
 
     # Vulnerabilities: findings["vulns"] expected to be a list of dicts.
@@ -91,6 +128,8 @@ def one_liners(findings: Dict) -> List[str]:
 
 # --- Safe Fix Checklist ---------------------------------------------------
 def fix_checklist(findings: Dict) -> List[str]:
+    if not _has_findings(findings):
+        return []
     fixes: List[str] = []
 
     # Secrets first (priority)
@@ -114,22 +153,20 @@ def fix_checklist(findings: Dict) -> List[str]:
         fixes.append(f"{c.get('fix','Fix configuration')} ({c.get('path','<file>')})")
 
     # Deduplicate preserve order
-    seen = set()
-    uniq: List[str] = []
-    for f in fixes:
-        if f not in seen:
-            uniq.append(f)
-            seen.add(f)
-    return uniq
+    return list(dict.fromkeys(fixes))
 
 
 # --- Render full report ---------------------------------------------------
 def render(score: int, findings: Dict) -> str:
-    body = [HEADER, f"\n**Cyber Health Score:** {score}/100\n"]
-    body.append("\n## Findings (Quick Read)\n")
-    for line in one_liners(findings):
-        body.append(f"- {line}")
-    body.append("\n## Safe Fix Checklist\n")
-    for item in fix_checklist(findings):
-        body.append(f"- [ ] {item}")
-    return "\n".join(body)
+    if not _has_findings(findings):
+        # Clean repo: nothing to list or fix
+        return "\n".join((HEADER, f"\n**Cyber Health Score:** {score}/100\n", "\nNo findings 🎉"))
+    # One join over lazily generated lines; no intermediate body list
+    return "\n".join(
+        chain(
+            (HEADER, f"\n**Cyber Health Score:** {score}/100\n", "\n## Findings (Quick Read)\n"),
+            ("- " + line for line in one_liners(findings)),
+            ("\n## Safe Fix Checklist\n",),
+            ("- [ ] " + item for item in fix_checklist(findings)),
+        )
+    )
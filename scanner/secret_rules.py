@@ -2,63 +2,115 @@
 import re
 from typing import List, Dict
 
-PATTERNS = [
-    ("AWS Access Key", re.compile(r"AKIA[0-9A-Z]{16}")),
+# (display name, pattern, severity, fix) per secret type. Secrets are ASCII,
+# so patterns are bytes with re.ASCII and run on the raw file data; only the
+# keywords are case-insensitive (scoped (?i:...)), and groups are
+# non-capturing. Variable-length parts are bounded so long runs of token-like
+# characters (minified JS, base64 blobs) cannot make a match run away.
+RULES = [
+    (
+        "AWS Access Key",
+        re.compile(rb"AKIA[0-9A-Z]{16}", re.ASCII),
+        "high",
+        "Rotate the key, invalidate the old one, and move to environment variables or a secret manager.",
+    ),
     (
         "AWS Secret Key",
         re.compile(
-            r"(?i)aws(.{0,20})?(secret|sk|secret_access_key)\s*[:=]\s*['\"]?[A-Za-z0-9/+=]{40}['\"]?"
+            rb"(?i:aws)[^\n]{0,20}(?i:secret|sk|secret_access_key)\s*[:=]\s*['\"]?[A-Za-z0-9/+=]{40}['\"]?",
+            re.ASCII,
         ),
+        "high",
+        "Same as above; use IAM roles where possible.",
+    ),
+    (
+        "Google API Key",
+        re.compile(rb"AIza[0-9A-Za-z\-_]{35}", re.ASCII),
+        "high",
+        "Regenerate the key, restrict by IP/referrer, and use environment variables or a secret manager.",
+    ),
+    (
+        "Generic Bearer Token",
+        re.compile(
+            rb"(?i:bearer)\s+(?!xox[baprs]-[A-Za-z0-9-]{10}|AIza[0-9A-Za-z\-_]{35}|AKIA[0-9A-Z]{16})"
+            rb"[A-Za-z0-9\-._~+/]{8,512}=*",
+            re.ASCII,
+        ),
+        "high",
+        "Revoke the token and load it at runtime via environment variables.",
+    ),
+    (
+        "Slack Token",
+        re.compile(rb"xox[baprs]-[A-Za-z0-9-]{10,48}", re.ASCII),
+        "high",
+        "Regenerate and store securely; use a vault or secret manager.",
+    ),
+    (
+        "Private Key",
+        re.compile(rb"-----BEGIN (?:RSA|DSA|EC|OPENSSH) PRIVATE KEY-----", re.ASCII),
+        "critical",
+        "Remove the private key from the repo, rotate it, and store in a secret manager.",
     ),
-    ("Google API Key", re.compile(r"AIza[0-9A-Za-z\-_]{35}")),
-    ("Generic Bearer Token", re.compile(r"(?i)bearer\s+[A-Za-z0-9\-._~+/]+=*")),
-    ("Slack Token", re.compile(r"xox[baprs]-[A-Za-z0-9-]{10,48}")),
-    ("Private Key", re.compile(r"-----BEGIN (?:RSA|DSA|EC|OPENSSH) PRIVATE KEY-----")),
     (
         "Password Hardcode",
         re.compile(
-            r"(?i)password\s*[:=]\s*['\"]?(admin123|12345|password|qwerty|letmein)['\"]?"
+            rb"(?i:password)\s*[:=]\s*['\"]?(?i:admin123|12345|password|qwerty|letmein)['\"]?",
+            re.ASCII,
         ),
+        "high",
+        "Use a strong unique password via an environment variable or password manager.",
     ),
 ]
 
+# All patterns folded into one alternation, one capturing group per pattern,
+# so a file is scanned once instead of once per pattern. finditer only yields
+# non-overlapping matches, so text covered by one rule cannot also be reported
+# by another; the bearer rule therefore leaves tokens owned by a more specific
+# rule (e.g. "Bearer xoxb-...") to that rule. The patterns only use
+# non-capturing groups, so m.lastindex is the 1-based pattern index and picks
+# its (display name, severity, fix) from _GROUP_META by position.
+PATTERNS_COMBINED = re.compile(
+    b"|".join(b"(" + rx.pattern + b")" for _, rx, _, _ in RULES),
+    re.ASCII,
+)
+_GROUP_META = (None,) + tuple((name, severity, fix) for name, _, severity, fix in RULES)
+# A capturing group inside a rule would shift every later index and silently
+# mislabel findings, so refuse to import rather than report the wrong type
+if PATTERNS_COMBINED.groups != len(RULES):
+    raise ValueError("secret rule patterns must not contain capturing groups; use (?:...)")
+
+# Literals at least one of which any pattern needs to match. Files containing
+# none of them skip the regex engine entirely. PREFILTER is checked as-is and
+# PREFILTER_NOCASE against a lower-cased copy (for the case-insensitive rules).
+PREFILTER = (b"AKIA", b"AIza", b"xox", b"-----BEGIN")
+PREFILTER_NOCASE = (b"aws", b"bearer", b"password")
+
 # Directories and file types to skip when scanning
 SKIP_DIRS = {"node_modules", ".git", "__pycache__", ".venv", "venv"}
 SKIP_EXT = {"jpg", "jpeg", "png", "gif", "woff", "woff2", "ttf", "otf", "min.js"}
 
 
-def scan_text(path: str, text: str) -> List[Dict]:
+def scan_text(path: str, data: bytes) -> List[Dict]:
     """
-    Scan a given text for secret patterns (API keys, tokens, passwords, etc.)
+    Scan raw file bytes for secret patterns (API keys, tokens, passwords, etc.)
     Returns a list of finding dicts.
     """
     findings: List[Dict] = []
-    for name, rx in PATTERNS:
-        for m in rx.finditer(text):
-            snippet = text[max(0, m.start() - 20) : m.end() + 20]
-            findings.append(
-                {
-                    "type": name,
-                    "path": path,
-                    "match": m.group(0)[:8] + "…",  # don’t leak real secrets
-                    "severity": "critical" if "Private Key" in name else "high",
-                    "fix": _fix_for(name),
-                }
-            )
+    if not any(lit in data for lit in PREFILTER):
+        lowered = data.lower()
+        if not any(lit in lowered for lit in PREFILTER_NOCASE):
+            return findings
+    for m in PATTERNS_COMBINED.finditer(data):
+        name, severity, fix = _GROUP_META[m.lastindex]
+        start, end = m.span()
+        findings.append(
+            {
+                "type": name,
+                "path": path,
+                # only the short preview is decoded; don’t leak real secrets
+                "match": data[start : min(end, start + 8)].decode("utf-8", errors="ignore") + "…",
+                "severity": severity,
+                "fix": fix,
+            }
+        )
     return findings
-
-
-def _fix_for(name: str) -> str:
-    """
-    Suggests a recommended fix for each secret type.
-    """
-    mapping = {
-        "Private Key": "Remove the private key from the repo, rotate it, and store in a secret manager.",
-        "AWS Access Key": "Rotate the key, invalidate the old one, and move to environment variables or a secret manager.",
-        "AWS Secret Key": "Same as above; use IAM roles where possible.",
-        "Google API Key": "Regenerate the key, restrict by IP/referrer, and use environment variables or a secret manager.",
-        "Generic Bearer Token": "Revoke the token and load it at runtime via environment variables.",
-        "Slack Token": "Regenerate and store securely; use a vault or secret manager.",
-        "Password Hardcode": "Use a strong unique password via an environment variable or password manager.",
-    }
-    return mapping.get(name, "Remove from source, rotate, and load via env/secret manager.")
@@ -1,18 +1,70 @@
 import io
+import os
 import zipfile
-from typing import Iterator, Tuple
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+from scanner.secret_rules import SKIP_DIRS, scan_text as scan_secrets
+from scanner.config_rules import scan_text as scan_configs
 
 TEXT_EXTS = {".py", ".txt", ".js", ".json", ".yml", ".yaml", ".env", ".html", ".md"}
+# Text members larger than this are generated or vendored data, not source
+MAX_BYTES = 10 * 1024 * 1024
 
-def extract_zip_to_memory(data: bytes) -> Iterator[Tuple[str, bytes]]:
+def iter_zip_members(
+    data: bytes,
+    text_only: bool = False,
+    max_bytes: Optional[int] = None,
+    skipped: Optional[List[str]] = None,
+) -> Iterator[Tuple[str, IO[bytes]]]:
+    """
+    Yield (name, stream) for each member; the stream is only valid until the
+    next item is requested. Names of members dropped for exceeding max_bytes
+    are appended to skipped, if given, so callers can report them.
+    """
     with zipfile.ZipFile(io.BytesIO(data)) as zf:
         for info in zf.infolist():
-            if not info.is_dir():
-                with zf.open(info) as f:
-                    yield info.filename, f.read()
+            if info.is_dir():
+                continue
+            # Decide from the central directory alone (name, size) so skipped
+            # members (binaries, vendored dirs, huge files) are never decompressed
+            if text_only and not is_scannable_path(info.filename):
+                continue
+            if max_bytes is not None and info.file_size > max_bytes:
+                if skipped is not None:
+                    skipped.append(info.filename)
+                continue
+            with zf.open(info) as f:
+                yield info.filename, f
+
+def extract_zip_to_memory(
+    data: bytes,
+    text_only: bool = False,
+    max_bytes: Optional[int] = None,
+    skipped: Optional[List[str]] = None,
+) -> Iterator[Tuple[str, bytes]]:
+    for name, f in iter_zip_members(data, text_only, max_bytes, skipped):
+        yield name, f.read()
+
+def read_gitignore(data: bytes) -> List[str]:
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        for info in zf.infolist():
+            if info.filename.endswith(".gitignore"):
+                return zf.read(info).decode("utf-8", errors="ignore").splitlines()
+    return []
 
 def is_text_path(path: str) -> bool:
-    for ext in TEXT_EXTS:
-        if path.lower().endswith(ext):
-            return True
-    return False
+    root, ext = os.path.splitext(path)
+    # splitext gives dotfiles such as ".env" no extension; use the name itself
+    return (ext or os.path.basename(root)).lower() in TEXT_EXTS
+
+def is_scannable_path(path: str) -> bool:
+    return is_text_path(path) and not any(p in SKIP_DIRS for p in path.split("/"))
+
+def scan_files(batch: List[Tuple[str, bytes]]) -> Tuple[List[Dict], List[Dict]]:
+    # Module-level so ProcessPoolExecutor can pickle it for worker processes.
+    secrets: List[Dict] = []
+    configs: List[Dict] = []
+    for path, data in batch:
+        secrets.extend(scan_secrets(path, data))
+        configs.extend(scan_configs(path, data))
+    return secrets, configs
@@ -0,0 +1,34 @@
+import unittest
+from collections import Counter
+
+from scanner.config_rules import RULES, scan_text
+
+# Lines (minified JS, one-line JSON/env) carrying several findings at once
+MULTI_FINDING_LINES = [
+    b'var cfg={cors_allowed_origins:"*",api_key:"sk_live_abcdefgh12345",debug=true};'
+    b"function f(a,b){return a*b}",
+    b'ALLOWED_HOSTS = ["*"]; SECRET_KEY = "django-insecure-abcdef123"  # see /* docs */',
+    b'DEBUG=1 PASSWORD=hunter2hunter2 CORS_ALLOWED_ORIGINS="*" token: abcdefgh12345678',
+    b'{"debug": 0, "allowed_hosts": "*", "api-key": "abcdefgh1234"}\nDEBUG = True',
+    b"allowed_hosts = example.com\ncors_allowed_origins = ['*']",
+]
+
+
+def per_rule_ids(data: bytes) -> Counter:
+    # Reference: each rule run as its own pass, as before the combined regex
+    return Counter(rule["id"] for rule in RULES for _ in rule["regex"].finditer(data))
+
+
+class CombinedScanTest(unittest.TestCase):
+    def test_matches_per_rule_passes(self):
+        for data in MULTI_FINDING_LINES:
+            with self.subTest(data=data):
+                self.assertEqual(Counter(f["id"] for f in scan_text("p", data)), per_rule_ids(data))
+
+    def test_open_hosts_does_not_hide_later_findings(self):
+        ids = Counter(f["id"] for f in scan_text("p", MULTI_FINDING_LINES[0]))
+        self.assertEqual(ids, Counter({"OPEN_HOSTS": 1, "HARDCODED_SECRET": 1, "DEBUG_MODE": 1}))
+
+
+if __name__ == "__main__":
+    unittest.main()